@@ -1,17 +1,69 @@
 import cv2
 import mediapipe as mp
 import threading
+import queue
+import concurrent.futures
 import numpy as np
 import sounddevice as sd
+from numba import njit
 import tkinter as tk
 from tkinter import ttk
 from PIL import Image, ImageTk
 import math
+import argparse
 from itertools import product
+from collections import deque
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+SINE_TABLE_SIZE = 4096
+BLOCK_SIZE = 1024  # Frames per audio callback, passed to OutputStream
+SYNTH_UPSAMPLE = 2  # Synthesis (oscillator + reverb) runs at fs / SYNTH_UPSAMPLE
+SYNTH_BLOCK = BLOCK_SIZE // SYNTH_UPSAMPLE
+MAX_REVERB_TIME = 1.0  # Largest roomSize the hand mapping produces
+# Left palm maps linearly onto FREQ_MIN..FREQ_MIN + FREQ_SPAN Hz: freq = FREQ_MIN + FREQ_SPAN * (1 - x)
+FREQ_MIN = 220
+FREQ_SPAN = 880 - 220
+
+
+# Eager signature so the kernel compiles (or loads from cache) at import time rather than on
+# the first audio callback. out is a strided view (a column of outdata), hence float32[:]
+@njit("(float64, float64, float32, float32[::1], int64[::1], float32[::1], float32[::1], float32[:], float32)",
+      cache=True, fastmath=True, boundscheck=False)
+def _synth_block(phase, inc, amplitude, lut, offsets, gains, acc, out, last_sample):
+    # One callback's worth of audio, compiled against the fixed SYNTH_BLOCK size:
+    # wavetable sine -> sparse reverb into the overlap-add accumulator -> clip -> 2x upsample.
+    # acc holds the tail of earlier blocks and must be at least SYNTH_BLOCK + offsets[-1] long;
+    # offsets/gains are the non-zero taps of the impulse response (tap 0 is the dry signal).
+    # Returns the advanced phase and the last synthesized sample for the next call.
+    table_size = len(lut)
+    num_taps = len(offsets)
+    # Samples outer, taps inner: each sample is spread over its few taps while it is in a
+    # register, and the taps only ever touch a window of the accumulator that slides forward
+    for n in range(SYNTH_BLOCK):
+        x = amplitude * lut[int(phase)]
+        phase += inc
+        if phase >= table_size:
+            phase -= table_size
+        for k in range(num_taps):
+            acc[n + offsets[k]] += x * gains[k]
+
+    # Linear interpolation up to fs: each odd output sample is a synthesized sample and
+    # each even one sits halfway to the previous synthesized sample
+    for n in range(SYNTH_BLOCK):
+        y = min(max(acc[n], -1.0), 1.0)
+        out[2 * n] = 0.5 * (last_sample + y)
+        out[2 * n + 1] = y
+        last_sample = y
+
+    # Drop the samples just played and move the pending tail to the front
+    tail = len(acc) - SYNTH_BLOCK
+    for j in range(tail):
+        acc[j] = acc[j + SYNTH_BLOCK]
+    acc[tail:] = 0.0
+    return phase, last_sample
+
 
 class HandTracker:
     def __init__(self):
@@ -21,105 +73,147 @@ class HandTracker:
             min_tracking_confidence=0.5
         )
         self.drawing_utils = mp.solutions.drawing_utils
-
-    def detect_hands(self, frame):
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # Frames are drawn on in RGB, so spell out MediaPipe's default red landmarks in RGB order
+        self.landmark_spec = self.drawing_utils.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2)
+        self.detect_width = 320  # Landmarks come back normalized, so inference can run downscaled
+
+    def downscale(self, rgb):
+        # Keep the camera's aspect ratio so hands aren't squashed before MediaPipe sees them
+        height, width = rgb.shape[:2]
+        size = (self.detect_width, round(self.detect_width * height / width))
+        return cv2.resize(rgb, size, interpolation=cv2.INTER_AREA)
+
+    def detect_hands(self, rgb):
+        # Expects an RGB frame; the caller converts once and reuses it for display
+        if rgb.shape[1] != self.detect_width:
+            rgb = self.downscale(rgb)
         results = self.hands.process(rgb)
         return results
 
 
 class AudioGeneration:
     def __init__(self, app_instance=None):
-        self.fs = 16000  # Sample rate
-        self.freq = 440.0
-        self.amplitude = 0.2
-        self.running = False
-        self.lock = threading.Lock()
-        self.phase = 0.0
-        self.roomSize = 0.3  # Affects reverb time
-        self.phase_offset = 0
+        self.fs = 16000  # Output (device) sample rate
+        self.fs_synth = self.fs // SYNTH_UPSAMPLE  # The sine tops out at 880 Hz, so 8 kHz is plenty
+        # (freq, amplitude, roomSize, tap offsets, tap gains) is replaced as a whole tuple, so the
+        # audio callback reads a consistent snapshot with a single attribute load and never takes a lock
+        self._params = self._make_params(440.0, 0.2, 0.3)  # roomSize affects reverb time
+        self._stop_event = threading.Event()
+        self._stop_event.set()  # No stream until start_audio
+        self._stream_thread = None
+        self.phase = 0.0  # Oscillator phase in table samples, [0, SINE_TABLE_SIZE)
+        self._sine_lut = np.sin(2 * np.pi * np.arange(SINE_TABLE_SIZE) / SINE_TABLE_SIZE).astype(np.float32)
         self.app_instance = app_instance
+        self._reverb_out = np.zeros(SYNTH_BLOCK + int(MAX_REVERB_TIME * self.fs_synth), dtype=np.float32)  # overlap-add accumulator, head is the current block
+        self._last_sample = 0.0  # Last synthesized sample of the previous block, for interpolation
+
+    @property
+    def freq(self):
+        return self._params[0]
+
+    @property
+    def amplitude(self):
+        return self._params[1]
+
+    @property
+    def roomSize(self):
+        return self._params[2]
+
+    @property
+    def running(self):
+        return not self._stop_event.is_set()
 
     def start_audio(self):
-        if not self.running:
-            self.running = True
-            threading.Thread(target=self.audioGen, daemon=True).start()
+        # Wait for a stopped stream thread to wind down before starting a new one
+        if self._stream_thread is not None and self._stream_thread.is_alive():
+            return
+        self._reverb_out[:] = 0.0
+        self._last_sample = 0.0
+        self._stop_event.clear()
+        self._stream_thread = threading.Thread(target=self.audioGen, daemon=True)
+        self._stream_thread.start()
 
     def stop_audio(self):
-        with self.lock:
-            self.running = False
+        self._stop_event.set()
+
+    def _make_params(self, freq, amplitude, roomSize, decay_factor=0.6, num_echoes=5):
+        # Sparse impulse response: the dry tap plus one decayed tap per echo, with roomSize as the
+        # reverb time. Built here on the caller's thread so the callback only has to unpack it
+        delay_samples = int((roomSize / num_echoes) * self.fs_synth)
+        taps = np.arange(num_echoes + 1, dtype=np.int64)  # Match the kernel signature on every platform
+        return freq, amplitude, roomSize, taps * delay_samples, (decay_factor ** taps).astype(np.float32)
 
     def set_frequency(self, freq):
-        with self.lock:
-            self.freq = freq
+        _, amplitude, roomSize, offsets, gains = self._params
+        self._params = (freq, amplitude, roomSize, offsets, gains)
 
     def set_amplitude(self, amplitude):
-        with self.lock:
-            self.amplitude = amplitude
+        freq, _, roomSize, offsets, gains = self._params
+        self._params = (freq, amplitude, roomSize, offsets, gains)
 
     def set_room_size(self, roomSize):
-        with self.lock:
-            self.roomSize = roomSize
-            if self.app_instance:  # check if app_instance exists
-                self.app_instance.visualizeReverb(self.roomSize)
+        freq, amplitude = self._params[:2]
+        self._params = self._make_params(freq, amplitude, roomSize)
+        if self.app_instance:  # check if app_instance exists
+            self.app_instance.visualizeReverb(roomSize)
 
     def set_parameters(self, freq, amplitude, roomSize):
-        with self.lock:
-            alpha = 0.2  # Smoothing factor
-            self.freq = self.freq * (1 - alpha) + freq * alpha
-            self.amplitude = self.amplitude * (1 - alpha) + amplitude * alpha
-            self.roomSize = self.roomSize * (1 - alpha) + roomSize * alpha
-            if self.app_instance:
-                self.app_instance.visualizeReverb(self.roomSize)
-
-    def apply_reverb(self, signal, reverb_time, decay_factor=0.6, num_echoes=5):
-
-        reverb_signal = np.copy(signal)
-        delay_samples = int((reverb_time / num_echoes) * self.fs)
-
-        for i in range(1, num_echoes + 1):
-            decay = decay_factor ** i
-            echo = np.zeros_like(signal)
-            if delay_samples * i < len(signal):
-                echo[delay_samples * i:] = signal[:-delay_samples * i] * decay
-                reverb_signal += echo
-
-        return np.clip(reverb_signal, -1.0, 1.0)
+        alpha = 0.2  # Smoothing factor
+        cur_freq, cur_amplitude, cur_roomSize = self._params[:3]
+        self._params = self._make_params(
+            cur_freq * (1 - alpha) + freq * alpha,
+            cur_amplitude * (1 - alpha) + amplitude * alpha,
+            cur_roomSize * (1 - alpha) + roomSize * alpha,
+        )
+        if self.app_instance:
+            self.app_instance.visualizeReverb(self.roomSize)
+
+    def _reverb_acc(self, offsets):
+        # Grow the accumulator (keeping the pending tail) only when the room exceeds MAX_REVERB_TIME
+        needed = SYNTH_BLOCK + offsets[-1]
+        if len(self._reverb_out) < needed:
+            grown = np.zeros(needed, dtype=np.float32)
+            grown[:len(self._reverb_out)] = self._reverb_out
+            self._reverb_out = grown
+        return self._reverb_out
 
     def audioGen(self):
         def callback(outdata, frames, time, status):
-            with self.lock:
-                if not self.running:
-                    raise sd.CallbackStop()
+            if self._stop_event.is_set():
+                raise sd.CallbackStop()
 
-                t = (np.arange(frames) + self.phase_offset) / self.fs
-                samples = self.amplitude * np.sin(2 * np.pi * self.freq * t).astype(np.float32)
+            assert frames == BLOCK_SIZE
+            freq, amplitude, _, offsets, gains = self._params
 
-                # Apply reverb using roomSize as the reverb time
-                samples = self.apply_reverb(samples, self.roomSize)
+            # The samples are float32; cast amplitude too so a float64 value (e.g. a numpy mean
+            # from the smoothing code) can't promote the kernel. Phase stays float64 so it doesn't drift
+            inc = freq * SINE_TABLE_SIZE / self.fs_synth
 
-                outdata[:, 0] = samples
-                self.phase_offset += frames
-                self.phase_offset %= self.fs
+            self.phase, self._last_sample = _synth_block(
+                self.phase, inc, np.float32(amplitude), self._sine_lut, offsets, gains,
+                self._reverb_acc(offsets), outdata[:, 0], np.float32(self._last_sample)
+            )
 
         try:
-            with sd.OutputStream(channels=1, callback=callback, samplerate=self.fs, dtype='float32', blocksize=1024):
-                while True:
-                    with self.lock:
-                        if not self.running:
-                            break
-                    sd.sleep(100)
+            with sd.OutputStream(channels=1, callback=callback, samplerate=self.fs, dtype='float32', blocksize=BLOCK_SIZE,
+                                 latency='low'):
+                self._stop_event.wait()
         except Exception as e:
             print(f"Audio stream error: {e}")
-            with self.lock:
-                self.running = False
+            self._stop_event.set()
 
 
 class App:
-    def __init__(self, root):
+    def __init__(self, root, preview_backend="tk"):
         self.root = root
         self.root.title("Hand Tracker with Audio")
 
+        # Where the camera preview goes: "tk" (canvas in this window), "cv2" (a separate
+        # cv2.imshow window, skipping the PIL/Tk copies) or None (headless, audio only)
+        self.preview_backend = preview_backend
+        self._preview_window = "Hand Tracker Preview"
+        self._preview_window_open = False  # cv2.destroyWindow errors on a window that doesn't exist
+
         self.camArr = []
         self.camNum = None
         self.cap = None
@@ -137,7 +231,13 @@ class App:
 
         # Initialize canvas with a default small size. It will be resized later.
         self.canvas = tk.Canvas(root, width=640, height=480, bg="black")
-        self.canvas.pack()
+        if self.preview_backend == "tk":
+            self.canvas.pack()
+
+        # One canvas item and one PhotoImage, refilled each frame (see _show_frame)
+        self._canvas_img = None
+        self._pil_img = None
+        self._tk_img = None
 
         # Init tracker/audio classes
         self.hand_tracker = HandTracker()
@@ -145,12 +245,29 @@ class App:
 
         # Buffers for smoothing
         self.frame_count = 0
-        self.freq_buffer = []
-        self.amp_buffer = []
-        self.roomSize_buffer = []
         self.smoothing_window = 5
+        self.freq_buffer = deque(maxlen=self.smoothing_window)
+        self.amp_buffer = deque(maxlen=self.smoothing_window)
+        self.roomSize_buffer = deque(maxlen=self.smoothing_window)
+        # Running sums of the buffers above, kept in step by _push_smoothed
+        self._freq_sum = 0.0
+        self._amp_sum = 0.0
+        self._roomSize_sum = 0.0
         self.update_interval = 5
 
+        # Per-handedness gesture mapping, looked up by MediaPipe's label
+        self._hand_handlers = {"Left": self._handle_left, "Right": self._handle_right}
+
+        # Hand detection runs on its own worker so capture never waits on it; frames that
+        # arrive while it is busy reuse the last finished results
+        self._infer_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+        # Capture + inference run on a producer thread; update_video consumes (frame, results) pairs.
+        # The queue is small so the producer drops frames instead of building up latency.
+        self._frame_queue = queue.Queue(maxsize=2)
+        self._alive = False
+        self._capture_thread = None
+
         #init matplotlib
         # Matplotlib plot for reverb visualization
         self.fig = plt.Figure(figsize=(3, 3), dpi=100, facecolor='None') #facecolor = 'none' sets the figure background transparent, (3,3) creates a smaller figure
@@ -244,6 +361,7 @@ class App:
         if self.after_id:
             self.root.after_cancel(self.after_id)
             self.after_id = None
+        self._stop_capture()
 
         # Release the current camera if it's open
         if self.cap and self.cap.isOpened():
@@ -257,7 +375,7 @@ class App:
             print(f"Failed to open camera {self.camNum}")
             self.cap = None  # Ensure it's None if opening failed
             self.audio_gen.stop_audio()  # Stop audio if camera fails
-            self.canvas.delete("all")  # Clear canvas
+            self._clear_preview()  # Clear canvas
             return
 
         # Attempt to set a preferred resolution, but it's not guaranteed.
@@ -278,7 +396,7 @@ class App:
             self.cap.release()
             self.cap = None  # Ensure it's None if it's a black screen
             self.audio_gen.stop_audio()  # Stop audio if camera fails
-            self.canvas.delete("all")  # Clear canvas
+            self._clear_preview()  # Clear canvas
             return
 
         # Get actual dimensions from the first valid frame
@@ -286,50 +404,99 @@ class App:
 
         # Resize the canvas to match the actual camera resolution
         self.canvas.config(width=actual_width, height=actual_height)
-        self.canvas.delete("all")  # Clear anything old on the canvas after resize
+        self._clear_preview()  # Clear anything old on the canvas after resize
 
         print(f"Camera {self.camNum} started successfully with resolution {actual_width}x{actual_height}.")
         self.status_label.config(text=f"Camera {self.camNum} is active.")
-        # Pass the first frame to update_video to avoid re-reading
-        self.update_video(initial_frame=(ret, frame))  # Pass both ret and frame
+        # Hand the first frame to the capture thread to avoid re-reading
+        self._start_capture(frame)
+        self.update_video()
+
+    def _start_capture(self, first_frame):
+        self._alive = True
+        self._capture_thread = threading.Thread(target=self._capture_loop, args=(self.cap, first_frame), daemon=True)
+        self._capture_thread.start()
+
+    def _stop_capture(self):
+        self._alive = False
+        if self._capture_thread is not None:
+            self._capture_thread.join()
+            self._capture_thread = None
+        while not self._frame_queue.empty():
+            self._frame_queue.get_nowait()
+
+    def _capture_loop(self, cap, frame):
+        # Producer: read and mirror frames off the Tk thread, feeding the detection worker
+        future = None
+        results = None
+        fresh = False  # results came from a detection not yet handed to update_video
+        while self._alive:
+            if frame is None:
+                ret, frame = cap.read()
+                if not ret:
+                    # Tell update_video the camera failed; this one must not be dropped
+                    while self._alive:
+                        try:
+                            self._frame_queue.put((None, None, False), timeout=0.1)
+                            break
+                        except queue.Full:
+                            pass
+                    return
 
-    def update_video(self, initial_frame=None):
+            frame = cv2.flip(frame, 1)  # Flip horizontally for mirror effect
+            # Convert once; detection, drawing and the preview all use this RGB frame
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if future is not None and future.done():
+                results = future.result()
+                fresh = True
+                future = None
+            if future is None:
+                # Downscale here so the worker owns its input while update_video draws on rgb
+                future = self._infer_pool.submit(self.hand_tracker.detect_hands, self.hand_tracker.downscale(rgb))
+
+            try:
+                self._frame_queue.put_nowait((rgb, results, fresh))
+                fresh = False
+            except queue.Full:
+                pass  # Keep fresh set so the next frame that gets through carries it
+            frame = None
+
+    def update_video(self):
         # If no camera is active, clear canvas and update status
         if self.cap is None or not self.cap.isOpened():
-            self.canvas.delete("all")  # Clear the canvas
+            self._clear_preview()  # Clear the canvas
             self.status_label.config(text="Waiting for camera selection or connection...")
             self.audio_gen.stop_audio()  # Ensure audio is stopped if camera is not active
             self.after_id = self.root.after(1000, self.update_video)  # Re-check after a short delay
             return
 
-        # Initialize ret and frame
-        ret = False
-        frame = None
-
-        if initial_frame is not None:
-            ret, frame = initial_frame  # Unpack ret and frame
-            initial_frame = None # Clear initial frame so subsequent calls read from camera
-        else:
-            ret, frame = self.cap.read()
-
-        if ret:  # Now 'ret' is guaranteed to be assigned
-            frame = cv2.flip(frame, 1)  # Flip horizontally for mirror effect
+        # Take the newest frame the capture thread has produced, if any. Results only change on
+        # fresh items, so a fresh one skipped here carries over to the newer frame
+        item = None
+        fresh = False
+        try:
+            while True:
+                item = self._frame_queue.get_nowait()
+                fresh = fresh or item[2]
+        except queue.Empty:
+            pass
 
-            # Call detect_hands and pass the frame
-            results = self.hand_tracker.detect_hands(frame)
+        if item is None:
+            self.after_id = self.root.after(10, self.update_video)
+            return
 
-            # Pass the results and frame to check_gesture
-            self.check_gesture(results, frame)
+        frame, results, _ = item
+        if frame is not None:
+            # Pass the results and frame to check_gesture (None until the first detection finishes)
+            if results is not None:
+                self.check_gesture(results, frame, fresh)
 
-            if self.cube_image is not None:
+            if self.preview_backend is not None and self.cube_image is not None:
                 # Resize cube image to desired overlay size (e.g., 200x200 pixels)
                 overlay_size = 200
                 cube_resized = self.cube_image.resize((overlay_size, overlay_size), Image.LANCZOS)
                 cube_np = np.array(cube_resized)  # Convert back to numpy array (RGBA)
 
-                # Convert video frame to RGBA for alpha blending
-                frame_rgba = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
-
                 # Define position for the overlay (e.g., top-left corner with some padding)
                 x_offset = 20
                 y_offset = 20
@@ -342,16 +509,18 @@ class App:
                 alpha_s = cube_np[:, :, 3] / 255.0  # Alpha channel of the cube
                 alpha_l = 1.0 - alpha_s  # Inverse alpha
 
+                # The frame is already RGB, so blend the cube's RGB channels straight into it
                 for c in range(0, 3):  # Iterate over R, G, B channels
-                    frame_rgba[y1:y2, x1:x2, c] = (alpha_s * cube_np[:, :, c] +
-                                                   alpha_l * frame_rgba[y1:y2, x1:x2, c])
-
-                frame = cv2.cvtColor(frame_rgba, cv2.COLOR_BGRA2BGR)
+                    frame[y1:y2, x1:x2, c] = (alpha_s * cube_np[:, :, c] +
+                                              alpha_l * frame[y1:y2, x1:x2, c])
 
-            # Convert frame to PhotoImage and display on canvas
-            img_tk = ImageTk.PhotoImage(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
-            self.canvas.create_image(0, 0, anchor=tk.NW, image=img_tk)
-            self.canvas.imgtk = img_tk  # Keep a reference to prevent garbage collection
+            if self.preview_backend == "tk":
+                # Copy the frame into the persistent PhotoImage on the canvas
+                self._show_frame(frame)
+            elif self.preview_backend == "cv2":
+                cv2.imshow(self._preview_window, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+                cv2.waitKey(1)
+                self._preview_window_open = True
 
             # Schedule next update AFTER the current frame is processed
             self.after_id = self.root.after(10, self.update_video)
@@ -359,93 +528,130 @@ class App:
             # If camera stops returning frames (e.g., disconnected or error)
             print("Failed to read frame from camera. Releasing camera.")
             self.status_label.config(text=f"Camera {self.camNum} disconnected or failed to read frames.")
+            self._stop_capture()
             if self.cap:
                 self.cap.release()
                 self.cap = None  # Indicate no active camera
             self.audio_gen.stop_audio()
-            self.canvas.delete("all")  # Clear the display
+            self._clear_preview()  # Clear the display
             self.after_id = self.root.after(1000, self.update_video)# Try to update again after a second
 
-    def check_gesture(self, results, frame):
-        saw_left = False
-        saw_right = False
+    def _show_frame(self, rgb):
+        height, width = rgb.shape[:2]
+        if self._canvas_img is None or self._pil_img.size != (width, height):
+            self.canvas.delete("all")
+            self._pil_img = Image.new('RGB', (width, height))
+            self._tk_img = ImageTk.PhotoImage(self._pil_img)
+            self._canvas_img = self.canvas.create_image(0, 0, anchor=tk.NW, image=self._tk_img)
+
+        self._pil_img.frombytes(rgb)
+        self._tk_img.paste(self._pil_img)
+
+    def _clear_preview(self):
+        self.canvas.delete("all")
+        self._canvas_img = None
+        if self._preview_window_open:
+            # Don't leave the last frame frozen in the cv2 window after a camera failure/switch
+            cv2.destroyWindow(self._preview_window)
+            cv2.waitKey(1)
+            self._preview_window_open = False
+
+    def check_gesture(self, results, frame, fresh=True):
+        # Stale results (reused while the detector is busy) are only drawn; feeding them to the
+        # smoothing buffers again would weight one detection several times
+        saw_hand = False
 
         if results.multi_hand_landmarks:
             for idx, hand_landmarks in enumerate(results.multi_hand_landmarks):
                 handedness = results.multi_handedness[idx].classification[0].label
 
-                self.hand_tracker.drawing_utils.draw_landmarks(
-                    frame, hand_landmarks, mp.solutions.hands.HAND_CONNECTIONS
-                )
-
-                if handedness == "Left":
-                    saw_left = True
-                    Lpalm_pos = hand_landmarks.landmark[0]
-
-                    # If you want low-to-high frequency to map to visual right-to-left hand movement (more natural for a mirror):
-                    freq = 220 + (880 - 220) * (1.0 - Lpalm_pos.x)  # Inverted X for frequency
-
-                    amplitude = 0.1 + 0.4 * (
-                            1.0 - Lpalm_pos.y)  # Inverted Y for amplitude (higher on screen = louder)
-
-                    self.freq_buffer.append(freq)
-                    self.amp_buffer.append(amplitude)
-                    if len(self.freq_buffer) > self.smoothing_window:
-                        self.freq_buffer.pop(0)
-                        self.amp_buffer.pop(0)
-
-                if handedness == "Right":
-                    saw_right = True
-                    thumbTip_pos = hand_landmarks.landmark[4]
-                    indexTip_pos = hand_landmarks.landmark[8]
-
-                    thumbTip_posX = thumbTip_pos.x
-                    thumbTip_posY = thumbTip_pos.y
-                    indexTip_posX = indexTip_pos.x
-                    indexTip_posY = indexTip_pos.y
-
-                    tipDistance_reverb = math.hypot(
-                        thumbTip_posX - indexTip_posX, thumbTip_posY - indexTip_posY
+                if self.preview_backend is not None:
+                    self.hand_tracker.drawing_utils.draw_landmarks(
+                        frame, hand_landmarks, mp.solutions.hands.HAND_CONNECTIONS,
+                        landmark_drawing_spec=self.hand_tracker.landmark_spec
                     )
 
-                    min_dist = 0.03
-                    max_dist = 0.4
-                    normalized_dist = (tipDistance_reverb - min_dist) / (max_dist - min_dist)
-                    normalized_dist = min(max(normalized_dist, 0.0), 1.0)
-
-                    room_size = 0.1 + normalized_dist * 0.9
+                handler = self._hand_handlers.get(handedness)
+                if fresh and handler is not None:
+                    handler(hand_landmarks)
+                    saw_hand = True
 
-                    self.roomSize_buffer.append(room_size)
-                    if len(self.roomSize_buffer) > self.smoothing_window:
-                        self.roomSize_buffer.pop(0)
+            if not fresh:
+                return
 
             self.audio_gen.start_audio()
 
             self.frame_count += 1
-            if self.frame_count % self.update_interval == 0 and (saw_left or saw_right):
-                avg_freq = sum(self.freq_buffer) / len(
+            if self.frame_count % self.update_interval == 0 and saw_hand:
+                avg_freq = self._freq_sum / len(
                     self.freq_buffer) if self.freq_buffer else self.audio_gen.freq
-                avg_amp = sum(self.amp_buffer) / len(
+                avg_amp = self._amp_sum / len(
                     self.amp_buffer) if self.amp_buffer else self.audio_gen.amplitude
-                avg_roomSize = sum(self.roomSize_buffer) / len(
+                avg_roomSize = self._roomSize_sum / len(
                     self.roomSize_buffer) if self.roomSize_buffer else self.audio_gen.roomSize
 
                 self.audio_gen.set_parameters(avg_freq, avg_amp, avg_roomSize)
-        else:
+        elif fresh:
             self.audio_gen.stop_audio()
 
+    def _handle_left(self, hand_landmarks):
+        Lpalm_pos = hand_landmarks.landmark[0]
+
+        # If you want low-to-high frequency to map to visual right-to-left hand movement (more natural for a mirror):
+        freq = FREQ_MIN + FREQ_SPAN * (1.0 - Lpalm_pos.x)  # Inverted X for frequency
+
+        amplitude = 0.1 + 0.4 * (
+                1.0 - Lpalm_pos.y)  # Inverted Y for amplitude (higher on screen = louder)
+
+        self._freq_sum = self._push_smoothed(self.freq_buffer, self._freq_sum, freq)
+        self._amp_sum = self._push_smoothed(self.amp_buffer, self._amp_sum, amplitude)
+
+    def _handle_right(self, hand_landmarks):
+        thumbTip_pos = hand_landmarks.landmark[4]
+        indexTip_pos = hand_landmarks.landmark[8]
+
+        dx = thumbTip_pos.x - indexTip_pos.x
+        dy = thumbTip_pos.y - indexTip_pos.y
+        tipDistance_reverb = math.hypot(dx, dy)
+
+        min_dist = 0.03
+        max_dist = 0.4
+        normalized_dist = (tipDistance_reverb - min_dist) / (max_dist - min_dist)
+        normalized_dist = min(max(normalized_dist, 0.0), 1.0)
+
+        room_size = 0.1 + normalized_dist * 0.9
+
+        self._roomSize_sum = self._push_smoothed(self.roomSize_buffer, self._roomSize_sum, room_size)
+
+    @staticmethod
+    def _push_smoothed(buffer, total, value):
+        # Append to a bounded deque and return its updated sum: subtract the sample
+        # about to be evicted, add the new one
+        if len(buffer) == buffer.maxlen:
+            total -= buffer[0]
+        buffer.append(value)
+        return total + value
+
     def on_close(self):
         self.audio_gen.stop_audio()
         # Cancel any pending 'after' calls
         if self.after_id:
             self.root.after_cancel(self.after_id)
             self.after_id = None
+        self._stop_capture()
+        self._infer_pool.shutdown(wait=False)
         if self.cap and self.cap.isOpened():
             self.cap.release()
             self.cap = None
+        if self.preview_backend == "cv2":
+            cv2.destroyAllWindows()
         self.root.destroy()
 
     def visualizeReverb(self, roomSize):
+        # The cube only exists as a preview overlay; headless mode skips the matplotlib render
+        if self.preview_backend is None:
+            return
+
         self.ax.clear()  # Clear the previous plot
 
         r_val = roomSize / 2
@@ -482,7 +688,12 @@ class App:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hand Tracker with Audio")
+    parser.add_argument("--preview", choices=["tk", "cv2", "none"], default="tk",
+                        help="camera preview backend; 'none' runs headless")
+    args = parser.parse_args()
+
     root = tk.Tk()
-    app = App(root)
+    app = App(root, preview_backend=None if args.preview == "none" else args.preview)
     root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
\ No newline at end of file